@@ -1,10 +1,41 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional, Set, List, Any
+from typing import Dict, Optional, Set, List, Any, Iterable, Iterator, Tuple
 import pandas as pd
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from decimal import Decimal
 
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional, stdlib json is a drop-in for loads()
+    import json as _json
+
+try:
+    import ijson
+except ImportError:  # ijson is optional, event pages are then decoded in one go
+    ijson = None
+
+# the pure Python ijson backends parse several times slower than orjson, only stream with a C one
+_stream_events = ijson is not None and ijson.backend in ('yajl2_c', 'yajl2_cffi')
+
+
+class _HeadRecorder:
+    """File-like wrapper that keeps the first bytes read from a stream."""
+
+    def __init__(self, raw: Any, limit: int = 1 << 16):
+        self.raw = raw
+        self.limit = limit
+        self.head = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        if len(self.head) < self.limit:
+            self.head += data
+        return data
+
 
 from type_handlers import StrictTypeHandler
 from interfaces import CompleteDataProvider
@@ -15,21 +46,117 @@ logger = logging.getLogger(__name__)
 class PhantasmaAPI(CompleteDataProvider):
     """Handles Phantasma Explorer API interaction."""
 
+    TRANSFER_COLUMNS = ['timestamp', 'from_address', 'to_address', 'quantity', 'transaction_hash']
+    SEND_EVENT_COLUMNS = ['timestamp', 'from_address', 'quantity', 'transaction_hash']
+    RECEIVE_EVENT_COLUMNS = ['to_address', 'transaction_hash']
+
     def __init__(self):
         self.base_url = "https://api-explorer.phantasma.info/api/v1"
+        self.events_url = f"{self.base_url}/events"
         self.type_handler = StrictTypeHandler()
+        self.timeout = 60
+
+        # token address -> symbol, the mapping never changes
+        self._symbol_cache: Dict[str, str] = {}
+
+        # keep-alive gzipped session, reused by every request
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        # the last failed response is returned instead of raised, so _check_response reports its body
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                        raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # TokenSend/TokenReceive events are fetched several pages ahead
+        self.prefetch_pages = 4
+        self.executor = ThreadPoolExecutor(max_workers=2 * self.prefetch_pages)
+
+        # pages worth of unpaired events kept per event kind while waiting for their counterparts
+        self.carry_pages = 5
+
+    def close(self) -> None:
+        """Stop the worker threads and release pooled connections."""
+        self.executor.shutdown(cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self) -> "PhantasmaAPI":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
     def _make_request(self, endpoint: str, params: Dict = None) -> Any:
         """Make request to Phantasma Explorer API."""
-        url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, params=params)
+        return self._get_json(f"{self.base_url}/{endpoint}", params)
 
+    @staticmethod
+    def _check_response(response: requests.Response) -> None:
+        """Raise if the API did not answer with 200."""
         if response.status_code != 200:
             raise ValueError(f"API request failed with code {response.status_code}: {response.text}")
 
-        return response.json()
+    def _get_json(self, url: str, params: Dict = None) -> Any:
+        """GET an already built API url and decode the JSON body."""
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        self._check_response(response)
+        return _json.loads(response.content)
+
+    def _get_event_columns(self, params: Dict) -> Dict[str, List]:
+        """Fetch one events page as columns, keeping only the fields transfers need."""
+        is_send = params['event_kind'] == 'TokenSend'
+        event_columns = self.SEND_EVENT_COLUMNS if is_send else self.RECEIVE_EVENT_COLUMNS
+        columns = {column: [] for column in event_columns}
+
+        if not _stream_events:
+            self._fill_event_columns(columns, self._get_json(self.events_url, params)['events'], is_send)
+            return columns
+
+        # parse while reading, so only one full event dict is alive at a time
+        with self.session.get(self.events_url, params=params, timeout=self.timeout, stream=True) as response:
+            self._check_response(response)
+            response.raw.decode_content = True
+            raw = _HeadRecorder(response.raw)
+            self._fill_event_columns(columns, ijson.items(raw, 'events.item'), is_send)
+
+        # ijson yields nothing for a missing array as well, tell it apart from an empty page like ['events'] would
+        if not columns['transaction_hash']:
+            try:
+                payload = _json.loads(bytes(raw.head))
+            except ValueError:
+                payload = {}
+            if not isinstance(payload, dict) or 'events' not in payload:
+                raise KeyError('events')
+        return columns
+
+    @staticmethod
+    def _fill_event_columns(columns: Dict[str, List], events: Iterable[Dict], is_send: bool) -> None:
+        """Append the transfer fields of each event to the column lists."""
+        transaction_hashes = columns['transaction_hash']
+        if is_send:
+            timestamps = columns['timestamp']
+            from_addresses = columns['from_address']
+            quantities = columns['quantity']
+            for event in events:
+                timestamps.append(int(event['date']))
+                from_addresses.append(event['address'])
+                quantities.append(str(event['token_event']['value']))
+                transaction_hashes.append(event['transaction_hash'])
+        else:
+            to_addresses = columns['to_address']
+            for event in events:
+                to_addresses.append(event['address'])
+                transaction_hashes.append(event['transaction_hash'])
 
     def get_symbol_by_token_address(self, token_address: str) -> str:
+        symbol = self._symbol_cache.get(token_address)
+        if symbol is not None:
+            return symbol
+
         params = {"address": token_address}
         results = self._make_request("addresses", params)
         result = results['addresses']
@@ -37,7 +164,135 @@ class PhantasmaAPI(CompleteDataProvider):
         if not result:
             raise ValueError(f"No token with {token_address}")
 
-        return result[0]['address_name']
+        symbol = result[0]['address_name']
+        self._symbol_cache[token_address] = symbol
+        return symbol
+
+    def _iter_event_pages(self, params: Dict, event_kind: str) -> Iterator[Future]:
+        """Yield futures of consecutive pages of one event kind, requesting pages in parallel batches.
+
+        Never ends on its own, the caller closes it once a page comes back short.
+        """
+        limit = params['limit']
+        offset = params['offset']
+        submit = self.executor.submit
+        get_event_columns = self._get_event_columns
+        # most tokens fit in a single page, so start with one page and double the batch while pages come back
+        # full, up to prefetch_pages; a batch may still request up to batch - 1 pages past the last one
+        batch = 1
+        while True:
+            # requests are in flight concurrently, so each one needs its own params dict
+            futures = [
+                submit(get_event_columns, dict(params, offset=offset + page * limit, event_kind=event_kind))
+                for page in range(batch)
+            ]
+            try:
+                for future in futures:
+                    yield future
+            finally:
+                # drop requests past the last page that have not started yet, running ones still complete
+                for future in futures:
+                    future.cancel()
+
+            offset += batch * limit
+            batch = min(batch * 2, self.prefetch_pages)
+
+    @staticmethod
+    def _join_transfer_events(sends: pd.DataFrame,
+                              receives: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Pair TokenSend and TokenReceive events by transaction hash.
+
+        Returns the paired transfers, then the sends and the receives that found no counterpart.
+        """
+        keys = ['transaction_hash', 'transfer_index']
+        # a transaction can carry several transfers, pair them in order of appearance
+        sends = sends.assign(transfer_index=sends.groupby('transaction_hash').cumcount())
+        receives = receives.assign(transfer_index=receives.groupby('transaction_hash').cumcount())
+
+        # left merges keep the API order, an outer merge would sort by hash
+        merged = sends.merge(receives, on=keys, how='left', indicator=True)
+        paired = merged['_merge'] == 'both'
+        unmatched_receives = receives.merge(sends[keys], on=keys, how='left', indicator=True)
+
+        return (
+            merged.loc[paired, PhantasmaAPI.TRANSFER_COLUMNS],
+            merged.loc[~paired, list(sends.columns.drop('transfer_index'))],
+            unmatched_receives.loc[unmatched_receives['_merge'] == 'left_only', list(receives.columns.drop('transfer_index'))]
+        )
+
+    @staticmethod
+    def _append_events(carry: pd.DataFrame, columns: Dict[str, List]) -> pd.DataFrame:
+        """Append one page of event columns to the events carried from earlier pages."""
+        page = pd.DataFrame(columns, copy=False)
+        if carry.empty:
+            return page
+        if page.empty:
+            return carry
+        return pd.concat([carry, page], ignore_index=True)
+
+    def _iter_transfer_pages(self, params: Dict) -> Iterator[pd.DataFrame]:
+        """Yield paired transfers page by page, carrying events whose counterpart lands on a later page.
+
+        TokenSend and TokenReceive are paged independently, so one kind may run ahead of the other.
+        """
+        limit = params['limit']
+        max_carry = self.carry_pages * limit
+        send_pages = self._iter_event_pages(params, 'TokenSend')
+        receive_pages = self._iter_event_pages(params, 'TokenReceive')
+        carry_sends = pd.DataFrame(columns=self.SEND_EVENT_COLUMNS)
+        carry_receives = pd.DataFrame(columns=self.RECEIVE_EVENT_COLUMNS)
+        evicted_sends = evicted_receives = 0
+        try:
+            while send_pages is not None or receive_pages is not None:
+                # once one kind is exhausted, the other is only paged while events of the first still wait for it
+                if send_pages is None and carry_sends.empty:
+                    break
+                if receive_pages is None and carry_receives.empty:
+                    break
+
+                # take both futures before waiting, so the two kinds are requested side by side
+                future_send = next(send_pages) if send_pages is not None else None
+                future_receive = next(receive_pages) if receive_pages is not None else None
+
+                sends = carry_sends
+                if future_send is not None:
+                    send_columns = future_send.result()
+                    if len(send_columns['transaction_hash']) < limit:
+                        send_pages.close()
+                        send_pages = None
+                    sends = self._append_events(carry_sends, send_columns)
+
+                receives = carry_receives
+                if future_receive is not None:
+                    receive_columns = future_receive.result()
+                    if len(receive_columns['transaction_hash']) < limit:
+                        receive_pages.close()
+                        receive_pages = None
+                    receives = self._append_events(carry_receives, receive_columns)
+
+                page_df, carry_sends, carry_receives = self._join_transfer_events(sends, receives)
+
+                # bound the carry, so each page re-merges at most carry_pages pages of leftovers
+                if len(carry_sends) > max_carry:
+                    evicted_sends += len(carry_sends) - max_carry
+                    carry_sends = carry_sends.iloc[-max_carry:]
+                if len(carry_receives) > max_carry:
+                    evicted_receives += len(carry_receives) - max_carry
+                    carry_receives = carry_receives.iloc[-max_carry:]
+
+                yield page_df
+        finally:
+            for pages in (send_pages, receive_pages):
+                if pages is not None:
+                    pages.close()
+
+        dropped_sends = evicted_sends + len(carry_sends)
+        dropped_receives = evicted_receives + len(carry_receives)
+        if dropped_sends or dropped_receives:
+            logger.warning(
+                f"Dropped {dropped_sends} TokenSend and {dropped_receives} TokenReceive events "
+                f"of {params['contract']} without a matching counterpart"
+            )
 
     def fetch_token_info(self, token_address: str) -> Optional[Dict]:
         """Fetch token information."""
@@ -78,26 +333,50 @@ class PhantasmaAPI(CompleteDataProvider):
                 'with_balance': 1
             }
 
-            all_holders = []
+            def pick_balance(balances: List[Dict]) -> str:
+                for b in balances:
+                    if b['token']['symbol'] == token_symbol:
+                        return b['amount']
+                return '0'
+
+            # balances are never negative, so the default 0 needs no filtering at all
+            check_min = min_balance > 0
+            # significant integer digits, so a min_balance below 1 has none and the digit check keeps everything
+            min_digits = len(str(int(min_balance)).lstrip('0'))
+
+            pages = []
             while True:
                 result = self._make_request("addresses", params)
 
                 if not result['addresses']:
                     break
 
-                for holder in result['addresses']:
-                    balance = next((b['amount'] for b in holder['balances'] if b['token']['symbol'] == token_symbol), '0')
-                    if Decimal(balance) >= min_balance:
-                        all_holders.append({
-                            'owner_address': holder['address'],
-                            'balance': balance
-                        })
+                holders = result['addresses']
+                page_df = pd.DataFrame({
+                    'owner_address': [holder['address'] for holder in holders],
+                    'balance': [pick_balance(holder['balances']) for holder in holders]
+                }, copy=False)
+
+                if check_min:
+                    # a balance with fewer significant integer digits than min_balance is below it,
+                    # drop such dust before Decimal parsing; anything else is left to the Decimal compare
+                    balances = page_df['balance'].astype(str)
+                    int_digits = balances.str.split('.', n=1).str[0].str.lstrip('0').str.len()
+                    page_df = page_df[(int_digits >= min_digits) | balances.str.contains('e', case=False)]
+
+                page_df = self.type_handler.format_holders_df(page_df)
+                if check_min:
+                    page_df = page_df[page_df['balance'] >= min_balance]
+                pages.append(page_df)
+
                 if len(result['addresses']) < params['limit']:
                     break
 
                 params['offset'] += params['limit']
-            df = pd.DataFrame(all_holders)
-            return self.type_handler.format_holders_df(df)
+
+            if not pages:
+                return self.type_handler.format_holders_df(pd.DataFrame(columns=['owner_address', 'balance']))
+            return pd.concat(pages, ignore_index=True)
         except Exception as e:
             logger.error(f"Holders fetch failed for {token_address}: {e}")
             return None
@@ -140,49 +419,30 @@ class PhantasmaAPI(CompleteDataProvider):
                 'with_event_data': 1
             }
 
-            all_transfers = []
-            while True:
-                result_send = self._make_request(
-                    "events",
-                    {'event_kind': 'TokenSend', **params}
-                )
-                result_receive = self._make_request(
-                    "events",
-                    {'event_kind': 'TokenReceive', **params}
-                )
-
-                if not result_send['events'] or not result_receive['events']:
-                    break
+            # transfer values are never negative, so the default 0 needs no Decimal parsing
+            check_min = min_value > 0
 
-                for index, event_send in enumerate(result_send['events']):
-                    event_receive = result_receive['events'][index]
-
-                    if Decimal(event_send['token_event']['value']) < min_value:
-                        continue
-
-                    if addresses:
-                        if from_address_only:
-                            if event_send['address'] not in addresses:
-                                continue
-                        else:
-                            if not any(address in addresses for address in (event_send['address'], event_receive['address'])):
-                                continue
-
-                    all_transfers.append({
-                        'timestamp': int(event_send['date']),
-                        'from_address': event_send['address'],
-                        'to_address': event_receive['address'],
-                        'quantity': event_send['token_event']['value'],
-                        'transaction_hash': event_send['transaction_hash']
-                    })
-
-                if len(result_send['events']) < params['limit']:
-                    break
+            pages = []
+            for page_df in self._iter_transfer_pages(params):
+                # address masks are vectorized, run them first so fewer rows need Decimal parsing
+                if addresses:
+                    from_match = page_df['from_address'].isin(addresses)
+                    if from_address_only:
+                        page_df = page_df[from_match]
+                    else:
+                        page_df = page_df[from_match | page_df['to_address'].isin(addresses)]
 
-                params['offset'] += params['limit']
+                # format per page, so raw strings are released before the next page arrives
+                page_df = self.type_handler.format_transfers_df(page_df)
 
-            df = pd.DataFrame(all_transfers)
-            return self.type_handler.format_transfers_df(df)
+                if check_min:
+                    page_df = page_df[page_df['quantity'] >= min_value]
+
+                pages.append(page_df)
+
+            if not pages:
+                return self.type_handler.format_transfers_df(pd.DataFrame(columns=self.TRANSFER_COLUMNS))
+            return pd.concat(pages, ignore_index=True)
         except Exception as e:
             logger.error(f"Transfers fetch failed for {token_address}: {e}")
             return None
@@ -204,42 +464,22 @@ class PhantasmaAPI(CompleteDataProvider):
                 'with_event_data': 1
             }
 
-            all_transfers = []
-            while True:
-                result_send = self._make_request(
-                    "events",
-                    {'event_kind': 'TokenSend', **params}
-                )
-                result_receive = self._make_request(
-                    "events",
-                    {'event_kind': 'TokenReceive', **params}
-                )
-
-                if not result_send['events'] or not result_receive['events']:
-                    break
-
-                for index, event_send in enumerate(result_send['events']):
-                    event_receive = result_receive['events'][index]
+            # KCAL has 10 decimals, float64 compares them against 0.005 exactly
+            kcal_guard = token_symbol == "KCAL"
+            kcal_threshold = 0.005
 
-                    # оплата комсы тоже считается за трансфер, игонириуем такие эвенты
-                    if token_symbol == "KCAL" and Decimal(event_send['token_event']['value']) < Decimal(0.005):
-                        continue
+            pages = []
+            for page_df in self._iter_transfer_pages(params):
+                # оплата комсы тоже считается за трансфер, игонириуем такие эвенты
+                if kcal_guard:
+                    page_df = page_df[pd.to_numeric(page_df['quantity']) >= kcal_threshold]
 
-                    all_transfers.append({
-                        'timestamp': int(event_send['date']),
-                        'from_address': event_send['address'],
-                        'to_address': event_receive['address'],
-                        'quantity': event_send['token_event']['value'],
-                        'transaction_hash': event_send['transaction_hash']
-                    })
-
-                if len(result_send['events']) < params['limit']:
-                    break
-
-                params['offset'] += params['limit']
+                page_df = self.type_handler.format_transfers_df(page_df)
+                pages.append(page_df)
 
-            df = pd.DataFrame(all_transfers)
-            return self.type_handler.format_transfers_df(df)
+            if not pages:
+                return self.type_handler.format_transfers_df(pd.DataFrame(columns=self.TRANSFER_COLUMNS))
+            return pd.concat(pages, ignore_index=True)
 
         except Exception as e:
             logger.error(f"Early transfers fetch failed for {token_address}: {e}")
@@ -261,16 +501,18 @@ class PhantasmaAPI(CompleteDataProvider):
 
             result = self._make_request("historyPrices", params)
 
-            prices = []
+            timestamps, usd_prices, volumes = [], [], []
             for price_point in result['history_prices']:
-                prices.append({
-                    'timestamp': int(price_point['date']),
-                    'average_price': price_point['price']['usd'],
-                    'close_price': price_point['price']['usd'],
-                    'volume': price_point.get('volume', '0')
-                })
-
-            df = pd.DataFrame(prices)
+                timestamps.append(int(price_point['date']))
+                usd_prices.append(price_point['price']['usd'])
+                volumes.append(price_point.get('volume', '0'))
+
+            df = pd.DataFrame({
+                'timestamp': timestamps,
+                'average_price': usd_prices,
+                'close_price': usd_prices,
+                'volume': volumes
+            }, copy=False)
             return self.type_handler.format_prices_df(df)
 
         except Exception as e:
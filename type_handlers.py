@@ -1,20 +1,27 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
+from numbers import Real
 from typing import Any, Dict
 import pandas as pd
 
+_fromtimestamp = datetime.fromtimestamp
+
 
 class StrictTypeHandler:
     """Enforces strict data typing and format consistency."""
 
+    # amounts repeat a lot (round numbers, fees), Decimal is immutable so it is safe to share
+    _decimal_cache: Dict[str, Decimal] = {}
+    _decimal_cache_size = 1 << 16
+
     @staticmethod
     def to_timestamp(value: Any) -> datetime:
-        print(value, type(value))
         """Convert to timestamp, ensuring timezone is removed."""
+        # unix seconds are the common case, read as UTC like to_timestamp_series
+        if isinstance(value, Real):
+            return _fromtimestamp(value, timezone.utc).replace(tzinfo=None)
         if isinstance(value, datetime):
             return value.replace(tzinfo=None)
-        if isinstance(value, (int, float)):
-            return datetime.fromtimestamp(value)
         try:
             # Convert to pandas timestamp and remove timezone
             ts = pd.to_datetime(value)
@@ -22,13 +29,25 @@ class StrictTypeHandler:
         except:
             raise ValueError(f"Cannot convert {value} to timestamp")
 
-    @staticmethod
-    def to_decimal(value: Any) -> Decimal:
+    @classmethod
+    def _cached_decimal(cls, value: str) -> Decimal:
+        """Build a Decimal from a string, reusing previously built ones."""
+        cache = cls._decimal_cache
+        result = cache.get(value)
+        if result is None:
+            result = Decimal(value)
+            if len(cache) >= cls._decimal_cache_size:
+                cache.clear()
+            cache[value] = result
+        return result
+
+    @classmethod
+    def to_decimal(cls, value: Any) -> Decimal:
         """Convert to Decimal."""
         if pd.isna(value):
             return Decimal('0')
         try:
-            return Decimal(str(value))
+            return cls._cached_decimal(str(value))
         except:
             raise ValueError(f"Cannot convert {value} to Decimal")
 
@@ -50,6 +69,36 @@ class StrictTypeHandler:
         except:
             raise ValueError(f"Cannot convert {value} to int")
 
+    @staticmethod
+    def to_timestamp_series(values: pd.Series) -> pd.Series:
+        """Convert a column to naive timestamps; numbers are unix seconds."""
+        if pd.api.types.is_numeric_dtype(values):
+            return pd.to_datetime(values, unit='s')
+        # object columns of numbers (e.g. ints mixed with None) are still unix seconds, not nanoseconds
+        if pd.api.types.infer_dtype(values, skipna=True) in ('integer', 'floating', 'mixed-integer-float'):
+            return pd.to_datetime(pd.to_numeric(values), unit='s')
+        converted = pd.to_datetime(values)
+        if converted.dt.tz is not None:
+            converted = converted.dt.tz_localize(None)
+        return converted
+
+    @classmethod
+    def to_decimal_series(cls, values: pd.Series) -> pd.Series:
+        """Convert a column to Decimal, missing values become 0."""
+        zero = Decimal('0')
+        cached_decimal = cls._cached_decimal
+        missing = values.isna().tolist()
+        return pd.Series(
+            [zero if na else cached_decimal(str(v)) for v, na in zip(values.tolist(), missing)],
+            index=values.index,
+            dtype=object
+        )
+
+    @staticmethod
+    def to_float_series(values: pd.Series) -> pd.Series:
+        """Convert a column to float, unparsable values become 0.0."""
+        return pd.to_numeric(values, errors='coerce').fillna(0.0).astype(float)
+
     @classmethod
     def format_token_info(cls, data: Dict) -> Dict:
         """Format token info to standard structure."""
@@ -87,82 +136,78 @@ class StrictTypeHandler:
         """Format holders dataframe to standard structure."""
         return pd.DataFrame({
             'owner_address': df['owner_address'].astype(str).str.strip(),
-            'balance': df['balance'].apply(cls.to_decimal)
+            'balance': cls.to_decimal_series(df['balance'])
         })
 
     @classmethod
     def format_historical_holders_df(cls, df: pd.DataFrame) -> pd.DataFrame:
         """Format holders dataframe to standard structure."""
         return pd.DataFrame({
-            'timestamp': df['timestamp'].apply(cls.to_timestamp),
+            'timestamp': cls.to_timestamp_series(df['timestamp']),
             'owner_address': df['owner_address'].astype(str).str.strip(),
-            'balance': df['balance'].apply(cls.to_decimal)
+            'balance': cls.to_decimal_series(df['balance'])
         })
 
     @classmethod
     def format_prices_df(cls, df: pd.DataFrame) -> pd.DataFrame:
         """Format prices dataframe to standard structure."""
         formatted_df = pd.DataFrame({
-            'timestamp': df['timestamp'].apply(cls.to_timestamp),
-            'average_price': df['average_price'].apply(cls.to_float),
-            'close_price': df['close_price'].apply(cls.to_float),
-            'volume': df['volume'].apply(cls.to_decimal)
+            'timestamp': cls.to_timestamp_series(df['timestamp']),
+            'average_price': cls.to_float_series(df['average_price']),
+            'close_price': cls.to_float_series(df['close_price']),
+            'volume': cls.to_decimal_series(df['volume'])
         })
-        # Ensure timestamp column has no timezone info
-        formatted_df['timestamp'] = formatted_df['timestamp'].dt.tz_localize(None)
         return formatted_df
 
     @classmethod
     def format_transfers_df(cls, df: pd.DataFrame) -> pd.DataFrame:
         """Format transfers dataframe to standard structure."""
         formatted_df = pd.DataFrame({
-            'timestamp': df['timestamp'].apply(cls.to_timestamp),
+            'timestamp': cls.to_timestamp_series(df['timestamp']),
             'from_address': df['from_address'].astype(str).str.strip(),
             'to_address': df['to_address'].astype(str).str.strip(),
-            'quantity': df['quantity'].apply(cls.to_decimal),
+            'quantity': cls.to_decimal_series(df['quantity']),
             'transaction_hash': df['transaction_hash'].astype(str).str.strip()
         })
-        # Ensure timestamp column has no timezone info
-        formatted_df['timestamp'] = formatted_df['timestamp'].dt.tz_localize(None)
         return formatted_df
 
+    # output column -> source column of the social metrics DataFrame
+    SOCIAL_COLUMNS = {
+        # Social Volume Metrics
+        'social_volume': 'social_volume',
+        'social_volume_change': 'social_volume_24h',
+        'social_dominance': 'social_dominance',
+
+        # Sentiment Metrics
+        'sentiment_score': 'sentiment',
+        'bullish_ratio': 'sentiment_relative_bullish',
+        'sentiment_change': 'sentiment_change_24h',
+
+        # Engagement Metrics
+        'contributors_active': 'contributors_active',
+        'posts_active': 'posts_active',
+        'interactions': 'interactions',
+        'spam_ratio': 'spam',
+
+        # News/Influencer Metrics
+        'posts_created': 'posts_created',
+        'contributors_created': 'contributors_created',
+
+        # Additional Context
+        'galaxy_score': 'galaxy_score',
+        'volume_24h': 'volume_24h',
+        'alt_rank': 'alt_rank',
+        'volatility': 'volatility',
+        'market_dominance': 'market_dominance'
+    }
+
     def format_social_df(self, df: pd.DataFrame) -> pd.DataFrame:
         """Format social metrics DataFrame to standard structure."""
         try:
-            metrics = {
-                # Social Volume Metrics
-                'social_volume': df.get('social_volume', 0),
-                'social_volume_change': df.get('social_volume_24h', 0),
-                'social_dominance': df.get('social_dominance', 0),
-
-                # Sentiment Metrics
-                'sentiment_score': df.get('sentiment', 0),
-                'bullish_ratio': df.get('sentiment_relative_bullish', 0),
-                'sentiment_change': df.get('sentiment_change_24h', 0),
-
-                # Engagement Metrics
-                'contributors_active': df.get('contributors_active', 0),
-                'posts_active': df.get('posts_active', 0),
-                'interactions': df.get('interactions', 0),
-                'spam_ratio': df.get('spam', 0),
-
-                # News/Influencer Metrics
-                'posts_created': df.get('posts_created', 0),
-                'contributors_created': df.get('contributors_created', 0),
-
-                # Additional Context
-                'galaxy_score': df.get('galaxy_score', 0),
-                'volume_24h': df.get('volume_24h', 0),
-                'alt_rank': df.get('alt_rank', 0),
-                'volatility': df.get('volatility', 0),
-                'market_dominance': df.get('market_dominance', 0)
-            }
-
-            # Convert all metrics to numeric, handling any conversion errors
-            formatted_df = pd.DataFrame({
-                metric: pd.to_numeric(values, errors='coerce')
-                for metric, values in metrics.items()
-            })
+            # Missing metrics are filled with 0, then everything is coerced to numeric
+            formatted_df = df.reindex(columns=list(self.SOCIAL_COLUMNS.values()), fill_value=0)
+            formatted_df.columns = list(self.SOCIAL_COLUMNS.keys())
+            formatted_df = formatted_df.apply(pd.to_numeric, errors='coerce')
 
             # Ensure timestamp index with no timezone
             formatted_df.index = pd.to_datetime(df.index)